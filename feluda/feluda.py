@@ -1,21 +1,21 @@
 import logging
 
-from feluda import config
-
 log = logging.getLogger(__name__)
 
-# test change in feluda for github aciton
-# change 44
 
 class Feluda:
     def __init__(self, configPath):
+        # Deferred so that importing feluda doesn't pull in yaml/dacite
+        from feluda import config
+
         self.config = config.load(configPath)
         self.store = None
+        self.operators = None
         if self.config.operators:
             from feluda.operator import Operator
 
             self.operators = Operator(self.config.operators)
 
     def setup(self):
-        if self.operators:
+        if self.operators is not None:
             self.operators.setup()
@@ -1,11 +1,89 @@
-import glob
+import functools
+import logging
 import os
 import re
+import shutil
 import subprocess
 import sys
-import tomlkit
-# import tomli
-# import tomli_w
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+# Only needed to re-serialize a pyproject.toml whose version can't be patched in place
+try:
+    import tomlkit
+except ModuleNotFoundError:
+    tomlkit = None
+
+log = logging.getLogger(__name__)
+
+# The version value of the [project] table, up to the next table header
+_VERSION_RE = re.compile(
+    r"""^(\[project\][ \t]*$(?:(?!^\[).)*?^version[ \t]*=[ \t]*")[^"\n]*(")""",
+    re.MULTILINE | re.DOTALL,
+)
+
+# Directories not searched for subpackages, unless they hold a pyproject.toml
+_IGNORED_DIRS = frozenset({
+    ".git", ".venv", "venv", "node_modules", "__pycache__", "dist", "build", ".tox",
+})
+
+# Conventional commit header: type, optional (scope) or [scope], optional "!" breaking marker
+_CC_RE = re.compile(
+    r"^(feat|fix|docs|style|refactor|perf|test|chore|build|ci|revert)(?:\([^)]*\)|\[[^\]]*\])?(!)?:",
+    re.IGNORECASE,
+)
+
+# The spec accepts BREAKING-CHANGE as a synonym for the BREAKING CHANGE footer
+_BREAKING_RE = re.compile(r"breaking[ -]change", re.IGNORECASE)
+
+# Upper bound on threads used to process packages concurrently
+_MAX_WORKERS = 8
+
+# Read size when streaming git log output
+_LOG_CHUNK_SIZE = 64 * 1024
+
+_BUMP_PRIORITY = {"major": 3, "minor": 2, "patch": 1}
+
+_TYPE_BUMP = {
+    "feat": "minor",
+    "fix": "patch",
+    # Default other types to patch
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_pyproject(pyproject_path, mtime_ns, size):
+    """
+    Read and parse a pyproject.toml, memoized on the file's path, mtime and size.
+
+    The returned document is shared between callers and must not be mutated.
+
+    Returns:
+        tuple: The raw file text and the parsed document.
+    """
+    # TOML is UTF-8 by spec; _write_version writes it back the same way
+    with open(pyproject_path, "r", encoding="utf-8") as f:
+        pyproject_text = f.read()
+    return pyproject_text, tomllib.loads(pyproject_text)
+
+
+def _read_pyproject(pyproject_path):
+    """
+    Read and parse a pyproject.toml, reusing the parse while the file is unchanged.
+
+    Args:
+        pyproject_path (str): Path to the pyproject.toml.
+
+    Returns:
+        tuple: The raw file text and the parsed document.
+    """
+    stat_result = os.stat(pyproject_path)
+    return _parse_pyproject(pyproject_path, stat_result.st_mtime_ns, stat_result.st_size)
 
 
 class PackageVersionManager:
@@ -27,7 +105,57 @@ class PackageVersionManager:
         self.repo_root = repo_root
         self.prev_commit = prev_commit
         self.current_commit = current_commit
-        self.packages = self._discover_packages()
+        # Defensive only: none of the git commands run here refresh the index,
+        # but this keeps any that might from taking .git/index.lock
+        self._git_env = {**os.environ, "GIT_OPTIONAL_LOCKS": "0"}
+
+        # The git queries don't depend on the discovered packages, so run them
+        # while the pyproject.toml files are being read
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            commits = executor.submit(self._read_commits)
+            all_tags = executor.submit(self._load_all_tags)
+            self.packages = self._discover_packages()
+
+        self._commits_by_package = self._bucket_commits(commits.result())
+        # Commit range is fixed for the run, so each package's bump is too
+        self._bump_cache = {}
+        self._all_tags = all_tags.result()
+        self._pending_tags = []
+        self._tags_lock = threading.Lock()
+
+    def _iter_pyprojects(self, top):
+        """
+        Find every pyproject.toml below a directory.
+
+        Directories in _IGNORED_DIRS (VCS metadata, virtualenvs, build output)
+        are not descended into unless they are package roots themselves, and
+        each directory is listed with a single os.scandir call.
+
+        Args:
+            top (str): Directory to search.
+
+        Yields:
+            str: Path of each pyproject.toml found, in sorted directory order.
+        """
+        pending_dirs = [top]
+        while pending_dirs:
+            child_dirs = []
+            found_pyproject = None
+            with os.scandir(pending_dirs.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        # A package may itself be named e.g. "build" or "dist"
+                        if entry.name not in _IGNORED_DIRS or os.path.isfile(
+                            os.path.join(entry.path, "pyproject.toml")
+                        ):
+                            child_dirs.append(entry.path)
+                    elif entry.name == "pyproject.toml" and entry.is_file():
+                        found_pyproject = entry.path
+
+            if found_pyproject:
+                yield found_pyproject
+            # Reversed because the stack is popped from the end
+            pending_dirs.extend(sorted(child_dirs, reverse=True))
 
     def _discover_packages(self):
         packages = {}
@@ -35,102 +163,119 @@ class PackageVersionManager:
         # Include root package if pyproject.toml exists
         root_pyproject = os.path.join(self.repo_root, "pyproject.toml")
         if os.path.exists(root_pyproject):
-            with open(root_pyproject, "r") as f:
-                pyproject_data = tomlkit.parse(f.read())
-
-            # Validate required fields
-            if all([
-                pyproject_data.get("project", {}).get("name"),
-                pyproject_data.get("project", {}).get("version"),
-                pyproject_data.get("tool", {})
-                    .get("semantic_release", {})
-                    .get("branches", {})
-                    .get("main", {})
-                    .get("tag_format"),
-            ]):
+            pyproject_text, pyproject_data = _read_pyproject(root_pyproject)
+
+            try:
+                name, version, tag_format = self._validate_pyproject(pyproject_data, root_pyproject)
+            except ValueError as e:
+                log.debug("Skipping root package: %s", e)
+            else:
                 packages["feluda"] = {
                     "package_path": self.repo_root,
+                    "rel_path": "",
                     "pyproject_path": root_pyproject,
-                    "current_version": pyproject_data["project"]["version"],
-                    "pyproject_data": pyproject_data,
+                    "name": name,
+                    "current_version": version,
+                    "pyproject_text": pyproject_text,
+                    "tag_name_fn": functools.partial(tag_format.format, name=name),
                 }
 
         # Discover subpackages - now explicitly looking in operators/ and components/ directories
         for subdir in ["operators", "components"]:
             subdir_path = os.path.join(self.repo_root, subdir)
-            if os.path.exists(subdir_path):
-                for pyproject_path in glob.glob(f"{subdir_path}/**/pyproject.toml", recursive=True):
+            if os.path.isdir(subdir_path):
+                for pyproject_path in self._iter_pyprojects(subdir_path):
                     package_root = os.path.dirname(pyproject_path)
                     try:
-                        with open(pyproject_path, "r") as f:
-                            pyproject_data = tomlkit.parse(f.read())
-
-                        # Validate required fields
-                        if all([
-                            pyproject_data.get("project", {}).get("name"),
-                            pyproject_data.get("project", {}).get("version"),
-                            pyproject_data.get("tool", {})
-                                .get("semantic_release", {})
-                                .get("branches", {})
-                                .get("main", {})
-                                .get("tag_format"),
-                        ]):
-                            package_name = pyproject_data["project"]["name"]
-                            packages[package_name] = {
-                                "package_path": package_root,
-                                "pyproject_path": pyproject_path,
-                                "current_version": pyproject_data["project"]["version"],
-                                "pyproject_data": pyproject_data,
-                            }
+                        pyproject_text, pyproject_data = _read_pyproject(pyproject_path)
+                        package_name, version, tag_format = self._validate_pyproject(pyproject_data, pyproject_path)
+                    except tomllib.TOMLDecodeError as e:
+                        # A ValueError subclass, but a broken manifest should not be skipped quietly
+                        log.warning("Skipping invalid package at %s: %s", package_root, e)
+                        continue
+                    except ValueError as e:
+                        # Not every pyproject.toml under these directories is released on its own
+                        log.debug("Skipping package at %s: %s", package_root, e)
+                        continue
                     except Exception as e:
-                        print(f"Skipping invalid package at {package_root}: {e}")
+                        log.warning("Skipping invalid package at %s: %s", package_root, e)
                         continue
 
+                    packages[package_name] = {
+                        "package_path": package_root,
+                        # As git reports it: relative to the repo root, "/"-separated
+                        "rel_path": os.path.relpath(package_root, self.repo_root).replace(os.sep, "/"),
+                        "pyproject_path": pyproject_path,
+                        "name": package_name,
+                        "current_version": version,
+                        "pyproject_text": pyproject_text,
+                        "tag_name_fn": functools.partial(tag_format.format, name=package_name),
+                    }
+
         if not packages:
             raise FileNotFoundError("No valid packages found in the repository")
 
         return packages
-    def _parse_conventional_commit(self, commit_message):
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _parse_conventional_commit(commit_message):
         """
         Parse a conventional commit message and determine version bump type.
+
+        Results are memoized, since the same commit message is seen once per
+        package it touches.
         """
         try:
-            message = commit_message.strip().lower()
+            if not commit_message or commit_message.isspace():
+                return None
 
             # Check for breaking changes anywhere in the message
-            if "breaking change" in message:
+            if _BREAKING_RE.search(commit_message):
                 return "major"
 
             # Extract commit type from the first line
-            first_line = message.split("\n")[0]
-            match = re.match(r"^(\w+)(?:\(|\[)?[^\)\]]*(?:\)|\])?:", first_line)
+            first_line = commit_message.lstrip().partition("\n")[0]
+            match = _CC_RE.match(first_line)
             if not match:
-                return "patch" if message else None
+                return "patch"
+
+            # A "!" before the colon marks a breaking change
+            if match.group(2):
+                return "major"
 
             commit_type = match.group(1).lower()
-            type_bump_map = {
-                "feat": "minor",
-                "fix": "patch",
-                # Default other types to patch
-            }
-            return type_bump_map.get(commit_type, "patch")
+            return _TYPE_BUMP.get(commit_type, "patch")
         except Exception as e:
-            print(f"Error parsing commit message: {e}")
+            log.error("Error parsing commit message: %s", e)
             return None
 
     def _validate_pyproject(self, pyproject_data, pyproject_path):
-        required_fields = [
-            pyproject_data.get("project", {}).get("name"),
-            pyproject_data.get("project", {}).get("version"),
-            pyproject_data.get("tool", {})
-                .get("semantic_release", {})
-                .get("branches", {})
-                .get("main", {})
-                .get("tag_format"),
-        ]
+        """
+        Pull the fields semantic release needs out of a parsed pyproject.toml.
+
+        Args:
+            pyproject_data (dict): The parsed pyproject.toml.
+            pyproject_path (str): Path to the file, for error messages.
+
+        Returns:
+            tuple: The project name, current version and tag format.
+
+        Raises:
+            ValueError: If any of the fields is missing or empty.
+        """
+        try:
+            project = pyproject_data["project"]
+            required_fields = (
+                project["name"],
+                project["version"],
+                pyproject_data["tool"]["semantic_release"]["branches"]["main"]["tag_format"],
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Missing required fields in {pyproject_path}: {e}") from None
         if not all(required_fields):
             raise ValueError(f"Missing required fields in {pyproject_path}")
-        return True
+        return required_fields
 
     def _bump_version(self, current_version, bump_type):
         """
@@ -168,54 +313,218 @@ class PackageVersionManager:
 
             return f"{major}.{minor}.{patch}"
         except ValueError:
-            print(f"Invalid version format: {current_version}")
+            log.error("Invalid version format: %s", current_version)
             raise
 
-    def get_package_commits(self, package_path):
+    def _resolve_commit_range(self):
+        """
+        Build the git revision range covering prev_commit through current_commit.
+
+        prev_commit itself is included by starting from its parent, unless it
+        is the repository's initial commit.
+
+        Returns:
+            str: The revision range to pass to git log.
+        """
         try:
-            # Handle initial commit (no parent)
-            try:
-                subprocess.run(
-                    ["git", "rev-parse", f"{self.prev_commit}^"],
-                    check=True,
-                    capture_output=True,
-                )
-                commit_range = f"{self.prev_commit}^..{self.current_commit}"
-            except subprocess.CalledProcessError:
-                commit_range = f"{self.prev_commit}..{self.current_commit}"
-
-            # For root package, we need to exclude all subpackages explicitly
-            if os.path.abspath(package_path) == os.path.abspath(self.repo_root):
-                # Get all subpackage paths to exclude
-                exclude_paths = []
-                for pkg_name, pkg_info in self.packages.items():
-                    if pkg_name != "feluda":  # Skip root package
-                        rel_path = os.path.relpath(pkg_info["package_path"], self.repo_root)
-                        exclude_paths.append(f":!{rel_path}")
-
-                cmd = [
-                    "git", "log", commit_range,
-                    "--pretty=format:%B",
-                    "--", ".", *exclude_paths
-                ]
-            else:
-                cmd = [
-                    "git", "log", commit_range,
-                    "--pretty=format:%B",
-                    "--", package_path
-                ]
-
-            result = subprocess.run(
-                cmd, cwd=self.repo_root, capture_output=True, text=True, check=True
+            subprocess.run(
+                ["git", "rev-parse", "--verify", f"{self.prev_commit}^"],
+                cwd=self.repo_root,
+                env=self._git_env,
+                check=True,
+                capture_output=True,
             )
-            return result.stdout.strip().split("\n\n")  # Split by commit
+            return f"{self.prev_commit}^..{self.current_commit}"
+        except subprocess.CalledProcessError:
+            # Handle initial commit (no parent)
+            return f"{self.prev_commit}..{self.current_commit}"
+
+    def _iter_log_commits(self, cmd):
+        """
+        Run a `git log --name-only -z` command and yield commits as git emits them.
+
+        Output is consumed in chunks rather than buffered whole, so work on the
+        first commits overlaps with git walking the rest of the history.
+
+        Args:
+            cmd (list): The git log command. Each commit must be formatted as
+                "\x01<message>\0" followed by its NUL-separated changed paths.
+
+        Yields:
+            tuple: (message, changed_paths) for each commit.
+
+        Raises:
+            subprocess.CalledProcessError: If the git command fails.
+        """
+        with subprocess.Popen(
+            cmd, cwd=self.repo_root, env=self._git_env, stdout=subprocess.PIPE, text=True
+        ) as process:
+            message = None
+            changed_paths = []
+            partial_token = ""
+            while True:
+                chunk = process.stdout.read(_LOG_CHUNK_SIZE)
+                tokens = (partial_token + chunk).split("\0")
+                # The last token may be cut off mid-read; keep it for the next chunk
+                partial_token = tokens.pop() if chunk else ""
+                for token in tokens:
+                    if token.startswith("\x01"):
+                        if message is not None:
+                            yield message, changed_paths
+                        message = token[1:]
+                        changed_paths = []
+                    elif token and message is not None:
+                        changed_paths.append(token.lstrip("\n"))
+                if not chunk:
+                    break
+
+            if process.wait():
+                raise subprocess.CalledProcessError(process.returncode, cmd)
+            if message is not None:
+                yield message, changed_paths
+
+    def _read_commits(self):
+        """
+        Read every commit in the range, with its changed paths, in a single
+        `git log` call.
+
+        Returns:
+            list: (message, changed_paths) tuples, one per commit. Empty if the
+            git command fails.
+        """
+        self._commit_range = self._resolve_commit_range()
+
+        # Rename detection is skipped: it is costly, and reporting both sides
+        # of a move lets the commit count for the package files were moved out
+        # of as well. Merge commits list no changed paths here, so they are
+        # left out entirely; the commits they bring in are still walked.
+        cmd = [
+            "git", "log", self._commit_range,
+            "--name-only", "-z", "--no-renames", "--no-merges",
+            "--format=format:%x01%B%x00",
+        ]
+        try:
+            return list(self._iter_log_commits(cmd))
         except subprocess.CalledProcessError as e:
-            print(f"Error getting commits for {package_path}: {e}")
+            log.error("Error getting commits for %s: %s", self._commit_range, e)
             return []
 
+    def _build_path_trie(self):
+        """
+        Index the subpackage directories as a trie keyed on path segments.
+
+        Returns:
+            dict: Nested dicts keyed by directory name, relative to the repo
+            root. A node that is a package root maps the key None to that
+            package's package_path.
+        """
+        path_trie = {}
+        for package_info in self.packages.values():
+            if not package_info["rel_path"]:
+                continue
+
+            node = path_trie
+            for segment in package_info["rel_path"].split("/"):
+                node = node.setdefault(segment, {})
+            node[None] = package_info["package_path"]
+        return path_trie
+
+    def _bucket_commits(self, commits):
+        """
+        Bucket commit messages by the package whose files they touch.
+
+        Files under a subpackage belong to that subpackage; everything else
+        belongs to the root package.
+
+        Args:
+            commits (list): (message, changed_paths) tuples from _read_commits.
+
+        Returns:
+            dict: A dictionary mapping each package_path to its commit messages.
+        """
+        commits_by_package = {
+            package_info["package_path"]: [] for package_info in self.packages.values()
+        }
+
+        root_path = None
+        for package_info in self.packages.values():
+            if not package_info["rel_path"]:
+                root_path = package_info["package_path"]
+        path_trie = self._build_path_trie()
+
+        for message, changed_paths in commits:
+            touched_paths = set()
+            for changed_path in changed_paths:
+                # Walk the file's directories down the trie; the deepest package
+                # on the way owns it
+                owner = root_path
+                node = path_trie
+                for segment in changed_path.split("/")[:-1]:
+                    node = node.get(segment)
+                    if node is None:
+                        break
+                    owner = node.get(None, owner)
+                if owner is not None:
+                    touched_paths.add(owner)
+
+            for package_path in touched_paths:
+                commits_by_package[package_path].append(message)
+
+        return commits_by_package
+
+    def _load_all_tags(self):
+        """
+        List every tag in the repository once, so tag checks don't shell out.
+
+        Returns:
+            set: The names of all existing Git tags.
+
+        Raises:
+            subprocess.CalledProcessError: If the git command fails.
+        """
+        # strip=2 drops the "refs/tags/" prefix; unlike refname:short it never
+        # disambiguates a tag that shares its name with a branch
+        result = subprocess.run(
+            ["git", "for-each-ref", "--format=%(refname:strip=2)", "refs/tags"],
+            cwd=self.repo_root,
+            env=self._git_env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return set(result.stdout.splitlines())
+
+    def get_package_commits(self, package_path):
+        """
+        Get the commit messages that touch a package.
+
+        Args:
+            package_path (str): Path to the package.
+
+        Returns:
+            list: Commit messages in the commit range that change the package.
+        """
+        return self._commits_by_package.get(package_path, [])
+
     def determine_package_bump(self, package_path):
         """
-        Determine the version bump type for a specific package.
+        Determine the version bump type for a specific package, computed once per run.
+
+        Args:
+            package_path (str): Relative path to the package.
+
+        Returns:
+            str or None: Version bump type.
+        """
+        try:
+            return self._bump_cache[package_path]
+        except KeyError:
+            bump = self._bump_cache[package_path] = self._compute_package_bump(package_path)
+            return bump
+
+    def _compute_package_bump(self, package_path):
+        """
+        Work out the version bump type for a package from its commit messages.
 
         Args:
             package_path (str): Relative path to the package.
@@ -234,151 +543,226 @@ class PackageVersionManager:
 
             # If no commits, skip this package
             if not package_commits:
-                print(f"No changes found for {package_path}. Skipping version bump.")
+                log.debug("No changes found for %s. Skipping version bump.", package_path)
                 return None
 
-            bump_priority = {"major": 3, "minor": 2, "patch": 1, None: 0}
             highest_bump = None
+            highest_priority = 0
 
             for commit in package_commits:
                 commit_bump = self._parse_conventional_commit(commit)
-                if commit_bump and bump_priority.get(
-                    commit_bump, 0
-                ) > bump_priority.get(highest_bump, 0):
-                    highest_bump = commit_bump
+                commit_priority = _BUMP_PRIORITY.get(commit_bump, 0)
+                if commit_priority > highest_priority:
+                    highest_bump, highest_priority = commit_bump, commit_priority
+                    # Nothing outranks a major bump
+                    if highest_bump == "major":
+                        break
 
             return highest_bump
         except Exception as e:
-            print(f"Error determining version bump for {package_path}: {e}")
+            log.error("Error determining version bump for %s: %s", package_path, e)
             return None
 
-    def _get_tag_format(self, package_info):
+    def _get_tag_name(self, package_info, new_version):
         """
-    Get the tag format for a package from its pyproject.toml.
+        Build the Git tag name for a package version from its tag format.
 
-    Args:
-        package_info (dict): A dictionary containing the package's pyproject data.
-                            Expected format: {"pyproject_data": <parsed_toml_data>}.
-
-    Returns:
-        str: The tag format string (e.g., "v{version}").
+        Args:
+            package_info (dict): The package's entry in self.packages.
+            new_version (str): The version to build the tag name for.
 
-    Raises:
-        ValueError: If the tag format is not found in pyproject.toml.
-        KeyError: If required keys are missing in pyproject.toml.
-    """
-        try:
-            pyproject_data = package_info["pyproject_data"]
-            tool = pyproject_data.get("tool", {})
-            tag_format = (
-                tool.get("semantic_release", {})
-                .get("branches", {})
-                .get("main", {})
-                .get("tag_format")
-            )
-            if not tag_format:
-                raise ValueError("tag_format not found in pyproject.toml")
-            return tag_format
-        except KeyError as e:
-            raise ValueError(f"Missing key in pyproject.toml: {e}")
+        Returns:
+            str: The tag name (e.g., "feluda-1.2.0").
+        """
+        # The package's tag_format, bound to its name at discovery
+        return package_info["tag_name_fn"](version=new_version)
 
-    def tag_exists(self, package_info, new_version):
+    def tag_exists(self, package_info, new_version, tag_name=None):
         """
-        Check if a Git tag exists for the package version based on tag format.
+        Check if a Git tag exists for the package version.
 
         Args:
-            package_info (dict): A dictionary containing tag format details from pyproject.toml.
-                                Expected format: {"package_path": "<path>", "pyproject_path": "<path_to_pyproject>"}
+            package_info (dict): The package's entry in self.packages; its
+                                tag_name_fn builds the tag name.
             new_version (str): The new version to check for in Git tags.
+            tag_name (str, optional): The tag name, if already built by _get_tag_name.
 
         Returns:
-            bool: True if the tag exists, otherwise False.
+            bool: True if the tag exists or is queued for creation, otherwise False.
         """
-        try:
-            pyproject_data = package_info["pyproject_data"]
-            project_name = pyproject_data["project"]["name"]
-            tag_format = self._get_tag_format(package_info)
+        if tag_name is None:
+            tag_name = self._get_tag_name(package_info, new_version)
+        return tag_name in self._all_tags
 
-            # Generate the tag name using the tag format
-            tag_name = tag_format.format(name=project_name, version=new_version)
+    def create_tag(self, package_info, new_version, tag_name=None):
+        """
+        Queue a Git tag for the updated package version.
 
-            # Run the git command to check if the tag exists
-            cmd = ["git", "tag", "--list", tag_name]
-            result = subprocess.run(
-                cmd, cwd=self.repo_root, capture_output=True, text=True, check=True
-            )
+        Queued tags are written to the repository together by _flush_tags.
 
-            # Check if the tag exists in the output
-            return tag_name in result.stdout.splitlines()
-        except subprocess.CalledProcessError as e:
-            print(f"Error: Failed to run git tag command to check tag for {package_info['package_path']}: {e}")
-            raise
-        except ValueError as e:
-            print(f"Error: {e}")
-            raise
-        except Exception as e:
-            print(f"Unexpected error in tag_exists: {e}")
-            raise
+        Args:
+            package_info (dict): The package's entry in self.packages; its
+                                tag_name_fn builds the tag name.
+            new_version (str): The new version to tag.
+            tag_name (str, optional): The tag name, if already built by _get_tag_name.
+        """
+        if tag_name is None:
+            tag_name = self._get_tag_name(package_info, new_version)
+
+        with self._tags_lock:
+            self._pending_tags.append(tag_name)
+            self._all_tags.add(tag_name)
 
-    def create_tag(self, package_info, new_version):
+    def _claim_tag(self, tag_name):
         """
-        Create a Git tag for the updated package version using the tag format from pyproject.toml.
+        Check that a tag is free and queue it for creation, as one step.
 
         Args:
-            package_info (dict): A dictionary containing tag format details from pyproject.toml.
-                                Expected format: {"package_path": "<path>", "pyproject_path": "<path_to_pyproject>"}
-            new_version (str): The new version to tag.
+            tag_name (str): The tag to claim.
 
         Returns:
-            None
+            bool: True if the tag was queued, False if it already exists or was
+            claimed by another package earlier in this run.
+        """
+        with self._tags_lock:
+            if tag_name in self._all_tags:
+                return False
+            self._pending_tags.append(tag_name)
+            self._all_tags.add(tag_name)
+            return True
+
+    def _release_tag(self, tag_name):
+        """
+        Drop a tag claimed with _claim_tag that will no longer be created.
 
-        Raises:
-            subprocess.CalledProcessError: If the git command fails to create the tag.
-            ValueError: If the tag format cannot be generated from pyproject.toml.
+        Args:
+            tag_name (str): The tag to release.
+        """
+        with self._tags_lock:
+            self._pending_tags.remove(tag_name)
+            self._all_tags.discard(tag_name)
 
-        Happy Path:
-            - If the tag format is found in `pyproject.toml` and the git tag command succeeds,
-            a new tag is created in the repository.
+    def _flush_tags(self):
+        """
+        Create all queued tags at HEAD with a single `git update-ref --stdin` call.
 
-        Failure Path:
-            - If the `tag_format` is not found in `pyproject.toml`.
-            - If the git command to create the tag fails.
+        The update is atomic: either every queued tag is created or none is.
+
+        Raises:
+            subprocess.CalledProcessError: If the git command fails to create the tags.
         """
+        if not self._pending_tags:
+            return
+
+        ref_updates = "".join(f"create refs/tags/{tag_name} HEAD\n" for tag_name in self._pending_tags)
         try:
-            with open(package_info["pyproject_path"], "rb") as f:
-                pyproject_data =tomlkit.parse(f.read())
+            subprocess.run(
+                ["git", "update-ref", "--stdin"],
+                input=ref_updates,
+                cwd=self.repo_root,
+                env=self._git_env,
+                text=True,
+                check=True,
+            )
+        except subprocess.CalledProcessError as e:
+            log.error("Error: Failed to create tags %s: %s", ", ".join(self._pending_tags), e)
+            raise
+
+        for tag_name in self._pending_tags:
+            log.info("Created tag %s", tag_name)
+        self._pending_tags = []
+
+    def _write_version(self, package_info, new_version):
+        """
+        Write a new version into a package's pyproject.toml.
+
+        Only the version value of the [project] table is rewritten, leaving the
+        rest of the file untouched. The whole document is re-serialized only if
+        that value can't be located. The file is replaced atomically, so an
+        interrupted run never leaves a half-written pyproject.toml behind.
 
-            # Retrieve project name
-            project_name = pyproject_data.get("project", {}).get("name")
-            if not project_name:
+        Args:
+            package_info (dict): The package's entry in self.packages.
+            new_version (str): The version to write.
+        """
+        new_text, count = _VERSION_RE.subn(
+            lambda match: match.group(1) + new_version + match.group(2),
+            package_info["pyproject_text"],
+            count=1,
+        )
+        if not count:
+            if tomlkit is None:
                 raise ValueError(
-                    f"Project name not found in {package_info['pyproject_path']}. Please specify it in the pyproject.toml."
+                    f"Could not locate the project version in {package_info['pyproject_path']}; "
+                    "install tomlkit to rewrite it."
                 )
+            # Parsed with tomlkit, not tomllib, so comments and formatting survive
+            pyproject_doc = tomlkit.parse(package_info["pyproject_text"])
+            pyproject_doc["project"]["version"] = new_version
+            new_text = tomlkit.dumps(pyproject_doc)
 
-            tag_format = self._get_tag_format(package_info)
+        if new_text == package_info["pyproject_text"]:
+            return
 
-            tag_name = tag_format.format(name=project_name, version=new_version)
+        pyproject_path = package_info["pyproject_path"]
+        tmp_path = pyproject_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(new_text)
+            shutil.copymode(pyproject_path, tmp_path)
+            os.replace(tmp_path, pyproject_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        package_info["pyproject_text"] = new_text
 
-            cmd = ["git", "tag", tag_name]
-            subprocess.run(cmd, cwd=self.repo_root, check=True)
+    def _process_package(self, package_info):
+        """
+        Bump a single package: decide the bump, write the new version and queue its tag.
 
-            print(f"Created tag {tag_name}")
-        except subprocess.CalledProcessError as e:
-            print(
-                f"Error: Failed to create tag for {package_info['package_path']}: {e}"
-            )
-            raise
-        except ValueError as e:
-            print(f"Error: {e}")
-            raise
-        except Exception as e:
-            print(f"Unexpected error in create_tag: {e}")
+        Safe to run concurrently for different packages. If several packages
+        resolve to the same tag name, only the first to claim it is bumped.
+
+        Args:
+            package_info (dict): The package's entry in self.packages.
+
+        Returns:
+            dict or None: The package's updated version information, or None if
+            the package needs no bump or the tag for the new version already exists.
+        """
+        bump_type = self.determine_package_bump(package_info["package_path"])
+        if not bump_type:
+            return None
+
+        current_version = package_info["current_version"]
+        new_version = self._bump_version(current_version, bump_type)
+
+        # Claim the tag before touching the file: packages sharing a tag format
+        # such as "v{version}" can resolve to the same tag, and only one may bump
+        tag_name = self._get_tag_name(package_info, new_version)
+        if not self._claim_tag(tag_name):
+            log.info("Tag %s already exists. Skipping bump.", tag_name)
+            return None
+
+        try:
+            self._write_version(package_info, new_version)
+        except Exception:
+            self._release_tag(tag_name)
             raise
+        return {
+            "old_version": current_version,
+            "new_version": new_version,
+            "bump_type": bump_type
+        }
 
     def update_package_versions(self):
         """
     Update versions for packages with changes and create Git tags.
 
+    Packages are processed concurrently; their tags are created together once
+    every package is done.
+
     Returns:
         dict: A dictionary mapping package names to their updated version information.
               Format: {
@@ -390,36 +774,39 @@ class PackageVersionManager:
               }
 
     Raises:
-        Exception: If an error occurs during version bumping or tag creation.
+        subprocess.CalledProcessError: If the tags can't be created. Tags are
+            created in one transaction after every pyproject.toml is written, so
+            none of them exist; the packages whose manifests were bumped but not
+            tagged are logged before this is raised.
     """
         updated_versions = {}
-        for package_name, package_info in self.packages.items():
+        # Each worker holds a pyproject.toml and its temp file open while
+        # writing; a small cap keeps large monorepos well clear of fd limits
+        with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(self.packages))) as executor:
+            futures = {
+                package_name: executor.submit(self._process_package, package_info)
+                for package_name, package_info in self.packages.items()
+            }
+
+        for package_name, future in futures.items():
             try:
-                bump_type = self.determine_package_bump(package_info["package_path"])
-                if not bump_type:
-                    continue
-
-                current_version = package_info["current_version"]
-                new_version = self._bump_version(current_version, bump_type)
-
-                # Check if the tag for the new_version exists
-                if self.tag_exists(package_info, new_version):
-                    print(f"Tag for {new_version} already exists. Skipping bump.")
-                    continue
-
-                # Update version and create tag
-                package_info["pyproject_data"]["project"]["version"] = new_version
-                with open(package_info["pyproject_path"], "w") as f:
-                    tomlkit.dump(package_info["pyproject_data"], f)
-
-                self.create_tag(package_info, new_version)
-                updated_versions[package_name] = {
-                    "old_version": current_version,
-                    "new_version": new_version,
-                    "bump_type": bump_type
-                }
+                update = future.result()
+                if update:
+                    updated_versions[package_name] = update
             except Exception as e:
-                print(f"Error updating {package_name}: {e}")
+                log.error("Error updating %s: %s", package_name, e)
+
+        try:
+            self._flush_tags()
+        except subprocess.CalledProcessError:
+            log.error(
+                "pyproject.toml was bumped but not tagged for: %s",
+                ", ".join(
+                    f"{package_name} ({update['old_version']} -> {update['new_version']})"
+                    for package_name, update in updated_versions.items()
+                ),
+            )
+            raise
         return updated_versions
 
 # Main script execution
@@ -429,6 +816,8 @@ if __name__ == "__main__":
         print("Usage: python semantic_release.py <prev_commit> <current_commit>")
         sys.exit(1)
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Get repository root (assumes script is run from repo root)
     repo_root = os.getcwd()
 
@@ -444,14 +833,15 @@ if __name__ == "__main__":
         updated_versions = version_manager.update_package_versions()
 
         if updated_versions:
-            print("\nVersion updates completed successfully:")
+            log.info("Version updates completed successfully:")
             for package, info in updated_versions.items():
-                print(
-                    f"{package}: {info['old_version']} -> {info['new_version']} ({info['bump_type']} bump)"
+                log.info(
+                    "%s: %s -> %s (%s bump)",
+                    package, info["old_version"], info["new_version"], info["bump_type"],
                 )
         else:
-            print("\nNo packages required version updates.")
+            log.info("No packages required version updates.")
 
     except Exception as e:
-        print(f"An error occurred during the version update process: {e}")
+        log.error("An error occurred during the version update process: %s", e)
         sys.exit(1)
@@ -4,6 +4,7 @@ import shutil
 import stat
 import pytest
 import tomlkit
+import semantic_release_workflow
 from semantic_release_workflow import PackageVersionManager
 
 # Constants
@@ -16,6 +17,15 @@ version = "1.0.0"
 [tool.semantic_release.branches.main]
 tag_format = "v{version}"
 """
+TEST_MONOREPO = "test_monorepo"
+MONOREPO_PYPROJECT_TOML = """
+[project]
+name = "{name}"
+version = "1.0.0"
+
+[tool.semantic_release.branches.main]
+tag_format = "{{name}}-{{version}}"
+"""
 
 
 def remove_readonly(func, path, _):
@@ -198,5 +208,296 @@ def test_tag_already_exists(setup_test_repo):
     # Verify no version bump occurred
     assert not updated_versions, "Version bump should be skipped when tag exists"
 
+
+def test_breaking_change_marker():
+    """
+    Test that a "!" after the commit type or scope marks a breaking change.
+    """
+    assert PackageVersionManager._parse_conventional_commit("feat!: drop the old API") == "major"
+    assert PackageVersionManager._parse_conventional_commit("fix(core)!: change a signature") == "major"
+    assert PackageVersionManager._parse_conventional_commit("feat(core): add an option") == "minor"
+    assert PackageVersionManager._parse_conventional_commit("feat[core]: add an option") == "minor"
+    assert PackageVersionManager._parse_conventional_commit("fix[core]!: change a signature") == "major"
+
+
+def test_breaking_change_footer():
+    """
+    Test that both spellings of the breaking change footer trigger a major bump.
+    """
+    assert PackageVersionManager._parse_conventional_commit("feat: x\n\nBREAKING CHANGE: y") == "major"
+    assert PackageVersionManager._parse_conventional_commit("fix: x\n\nBREAKING-CHANGE: y") == "major"
+
+
+def write_file(path, content):
+    """
+    Write a file relative to the current directory, creating its parent directories.
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def commit(message):
+    """
+    Commit everything in the working tree and return the new commit hash.
+    """
+    subprocess.run(["git", "add", "."], check=True)
+    subprocess.run(["git", "commit", "-q", "-m", message], check=True)
+    result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+@pytest.fixture(scope="function")
+def setup_monorepo():
+    """
+    Fixture to set up a test Git repository laid out like feluda: a root package,
+    an operator and an operator nested inside it.
+    """
+    original_dir = os.getcwd()
+
+    test_repo_path = os.path.abspath(TEST_MONOREPO)
+    if os.path.exists(test_repo_path):
+        shutil.rmtree(test_repo_path, onerror=remove_readonly)
+    os.makedirs(test_repo_path)
+    os.chdir(test_repo_path)
+
+    subprocess.run(["git", "init", "-q", "-b", "main"], check=True)
+    write_file("pyproject.toml", MONOREPO_PYPROJECT_TOML.format(name="feluda"))
+    write_file("operators/op_a/pyproject.toml", MONOREPO_PYPROJECT_TOML.format(name="op-a"))
+    write_file("operators/op_a/nested/pyproject.toml", MONOREPO_PYPROJECT_TOML.format(name="op-a-nested"))
+    commit("chore: initial commit")
+
+    yield test_repo_path
+
+    os.chdir(original_dir)
+    shutil.rmtree(test_repo_path, onerror=remove_readonly)
+
+
+def package_messages(version_manager, name):
+    """
+    Return the commit subjects assigned to a package.
+    """
+    package_path = version_manager.packages[name]["package_path"]
+    return sorted(message.strip() for message in version_manager.get_package_commits(package_path))
+
+
+def test_commits_assigned_to_owning_package(setup_monorepo, monkeypatch):
+    """
+    Test that each commit goes to the innermost package containing the files it
+    touches, with files outside every subpackage going to the root package.
+    """
+    # Force git log output to be split across many reads
+    monkeypatch.setattr(semantic_release_workflow, "_LOG_CHUNK_SIZE", 7)
+
+    write_file("operators/op_a/nested/main.py", "pass")
+    first_commit = commit("feat: nested feature")
+    write_file("operators/op_a/main.py", "pass")
+    write_file("README.md", "docs")
+    commit("fix: operator and root fix")
+    write_file("feluda/core.py", "pass")
+    current_commit = commit("chore: root only")
+
+    version_manager = PackageVersionManager(setup_monorepo, first_commit, current_commit)
+
+    assert package_messages(version_manager, "op-a-nested") == ["feat: nested feature"]
+    assert package_messages(version_manager, "op-a") == ["fix: operator and root fix"]
+    assert package_messages(version_manager, "feluda") == ["chore: root only", "fix: operator and root fix"]
+
+
+def test_commits_from_merged_branch(setup_monorepo):
+    """
+    Test that commits brought in through a merge's second parent are assigned,
+    while the merge commit itself is not.
+    """
+    subprocess.run(["git", "checkout", "-q", "-b", "feature"], check=True)
+    write_file("operators/op_a/main.py", "pass")
+    commit("feat: operator feature")
+
+    subprocess.run(["git", "checkout", "-q", "main"], check=True)
+    write_file("README.md", "docs")
+    first_commit = commit("fix: root fix")
+    subprocess.run(["git", "merge", "-q", "--no-ff", "-m", "feat: merge feature", "feature"], check=True)
+    result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    current_commit = result.stdout.strip()
+
+    version_manager = PackageVersionManager(setup_monorepo, first_commit, current_commit)
+
+    assert package_messages(version_manager, "op-a") == ["feat: operator feature"]
+    assert package_messages(version_manager, "feluda") == ["fix: root fix"]
+    assert package_messages(version_manager, "op-a-nested") == []
+
+
+def write_version(version_manager, content, new_version):
+    """
+    Write content to a scratch pyproject.toml, set its version with
+    _write_version and return the resulting file text.
+    """
+    pyproject_path = os.path.abspath("scratch_pyproject.toml")
+    write_file(pyproject_path, content)
+    os.chmod(pyproject_path, 0o640)
+    version_manager._write_version(
+        {"pyproject_path": pyproject_path, "pyproject_text": content}, new_version
+    )
+    assert not os.path.exists(pyproject_path + ".tmp"), "The temporary file should be swapped into place."
+    assert stat.S_IMODE(os.stat(pyproject_path).st_mode) == 0o640, "The file mode should be preserved."
+    with open(pyproject_path) as f:
+        return f.read()
+
+
+def test_write_version_with_project_subtable(setup_monorepo):
+    """
+    Test that only the [project] version changes when [project.urls] follows it.
+    """
+    version_manager = PackageVersionManager(setup_monorepo, "HEAD", "HEAD")
+    content = (
+        '[project]\nname = "pkg"\nversion = "1.0.0"  # bumped by CI\n\n'
+        '[project.urls]\nHomepage = "https://example.com"\n'
+    )
+
+    assert write_version(version_manager, content, "1.1.0") == content.replace('"1.0.0"', '"1.1.0"')
+
+
+def test_write_version_ignores_other_tables(setup_monorepo):
+    """
+    Test that version keys outside the [project] table are left alone.
+    """
+    version_manager = PackageVersionManager(setup_monorepo, "HEAD", "HEAD")
+    content = (
+        '[tool.before]\nversion = "1.0.0"\n\n'
+        '[project]\nname = "pkg"\nversion = "1.0.0"\n\n'
+        '[tool.after]\nversion = "1.0.0"\n'
+    )
+
+    assert write_version(version_manager, content, "2.0.0") == (
+        '[tool.before]\nversion = "1.0.0"\n\n'
+        '[project]\nname = "pkg"\nversion = "2.0.0"\n\n'
+        '[tool.after]\nversion = "1.0.0"\n'
+    )
+
+
+def test_write_version_unmatched_header(setup_monorepo):
+    """
+    Test that a [project] header the version pattern can't match falls back to
+    tomlkit, keeping comments and the other tables intact.
+    """
+    version_manager = PackageVersionManager(setup_monorepo, "HEAD", "HEAD")
+    content = (
+        '[project]  # comment\nname = "pkg"\nversion = "1.0.0"\n\n'
+        '[tool.after]\nversion = "1.0.0"\n'
+    )
+
+    new_content = write_version(version_manager, content, "1.0.1")
+    pyproject_data = tomlkit.parse(new_content)
+    assert pyproject_data["project"]["version"] == "1.0.1"
+    assert pyproject_data["tool"]["after"]["version"] == "1.0.0"
+    assert "# comment" in new_content, "Comments should survive the fallback."
+
+
+def test_tags_created_in_one_batch(setup_monorepo):
+    """
+    Test that queued tags are only created by _flush_tags, all at HEAD.
+    """
+    version_manager = PackageVersionManager(setup_monorepo, "HEAD", "HEAD")
+    version_manager.create_tag(version_manager.packages["op-a"], "1.0.1")
+    version_manager.create_tag(version_manager.packages["feluda"], "1.1.0")
+
+    result = subprocess.run(["git", "tag", "--list"], capture_output=True, text=True, check=True)
+    assert not result.stdout, "No tag should be created before the batch is flushed."
+
+    version_manager._flush_tags()
+
+    result = subprocess.run(
+        ["git", "tag", "--points-at", "HEAD"], capture_output=True, text=True, check=True
+    )
+    assert sorted(result.stdout.split()) == ["feluda-1.1.0", "op-a-1.0.1"]
+    assert not version_manager._pending_tags
+
+
+def test_update_package_versions_in_monorepo(setup_monorepo):
+    """
+    Test a full run: only the changed operator is bumped, its pyproject.toml is
+    rewritten and its tag is created.
+    """
+    write_file("operators/op_a/main.py", "pass")
+    commit_hash = commit("fix: operator fix")
+
+    version_manager = PackageVersionManager(setup_monorepo, commit_hash, commit_hash)
+    updated_versions = version_manager.update_package_versions()
+
+    assert updated_versions == {
+        "op-a": {"old_version": "1.0.0", "new_version": "1.0.1", "bump_type": "patch"},
+    }
+    with open("operators/op_a/pyproject.toml") as f:
+        assert tomlkit.parse(f.read())["project"]["version"] == "1.0.1"
+    result = subprocess.run(
+        ["git", "tag", "--points-at", "HEAD"], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == ["op-a-1.0.1"]
+
+
+def test_shared_tag_format_bumps_one_package(setup_monorepo):
+    """
+    Test that when two packages resolve to the same tag name, only one of them
+    is bumped and tagged.
+    """
+    shared_pyproject = MONOREPO_PYPROJECT_TOML.replace("{{name}}-{{version}}", "v{{version}}")
+    write_file("operators/op_b/pyproject.toml", shared_pyproject.format(name="op-b"))
+    write_file("operators/op_c/pyproject.toml", shared_pyproject.format(name="op-c"))
+    commit("chore: add operators")
+    write_file("operators/op_b/main.py", "pass")
+    write_file("operators/op_c/main.py", "pass")
+    commit_hash = commit("fix: fix both operators")
+
+    version_manager = PackageVersionManager(setup_monorepo, commit_hash, commit_hash)
+    updated_versions = version_manager.update_package_versions()
+
+    assert len(updated_versions) == 1, "Only one package may take the shared tag."
+    bumped_package = next(iter(updated_versions))
+    assert updated_versions[bumped_package]["new_version"] == "1.0.1"
+    for package_name in ("op-b", "op-c"):
+        with open(version_manager.packages[package_name]["pyproject_path"]) as f:
+            version = tomlkit.parse(f.read())["project"]["version"]
+        assert version == ("1.0.1" if package_name == bumped_package else "1.0.0")
+    result = subprocess.run(
+        ["git", "tag", "--points-at", "HEAD"], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == ["v1.0.1"]
+
+
+def test_failed_tag_batch_reports_untagged_packages(setup_monorepo, caplog):
+    """
+    Test that when the tag batch fails, the packages left bumped but untagged are
+    reported and the error is raised.
+    """
+    write_file("operators/op_a/main.py", "pass")
+    commit_hash = commit("fix: operator fix")
+
+    version_manager = PackageVersionManager(setup_monorepo, commit_hash, commit_hash)
+    # Created after the manager read the tags, so only the batch notices it
+    subprocess.run(["git", "tag", "op-a-1.0.1"], check=True)
+
+    with pytest.raises(subprocess.CalledProcessError):
+        version_manager.update_package_versions()
+    assert "op-a (1.0.0 -> 1.0.1)" in caplog.text
+
+
+def test_package_named_like_ignored_directory(setup_monorepo):
+    """
+    Test that a package whose directory shares a name with build output is still
+    discovered, while pyproject.toml files deeper inside ignored directories are not.
+    """
+    write_file("operators/build/pyproject.toml", MONOREPO_PYPROJECT_TOML.format(name="op-build"))
+    write_file(
+        "operators/op_a/.venv/lib/dep/pyproject.toml", MONOREPO_PYPROJECT_TOML.format(name="dep")
+    )
+    commit_hash = commit("chore: add operators")
+
+    version_manager = PackageVersionManager(setup_monorepo, commit_hash, commit_hash)
+
+    assert "op-build" in version_manager.packages
+    assert "dep" not in version_manager.packages
+
+
 if __name__ == "__main__":
     pytest.main()